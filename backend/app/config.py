@@ -1,8 +1,13 @@
-from functools import lru_cache
-from typing import List
+import hashlib
+import re
+from functools import cached_property, lru_cache
+from typing import Annotated, List, Optional
 
+import orjson
 from pydantic import Field, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+_ORIGIN_SEPARATOR = re.compile(r"[,\s]+")
 
 
 class Settings(BaseSettings):
@@ -13,6 +18,9 @@ class Settings(BaseSettings):
     ollama_base_url: str = Field(
         "http://localhost:11434", validation_alias="OLLAMA_BASE_URL", description="Base URL for the Ollama daemon"
     )
+    ollama_uds: Optional[str] = Field(
+        None, validation_alias="OLLAMA_UDS", description="Unix socket path for the Ollama daemon, if it listens on one"
+    )
     default_model: str = Field(
         "llama3", validation_alias="DEFAULT_MODEL", description="Default Ollama model to use when none is provided"
     )
@@ -20,7 +28,8 @@ class Settings(BaseSettings):
     api_key_optional: bool = Field(True, validation_alias="API_KEY_OPTIONAL", description="Toggle API key enforcement")
     rate_limit_rps: float = Field(3.0, validation_alias="RATE_LIMIT_RPS", description="Token refill rate per second")
     rate_limit_burst: int = Field(6, validation_alias="RATE_LIMIT_BURST", description="Maximum burst size for rate limiter")
-    cors_origins: List[str] = Field(
+    # NoDecode hands the raw env string to _parse_origins so CSV values work alongside JSON lists.
+    cors_origins: Annotated[List[str], NoDecode] = Field(
         default_factory=lambda: ["http://localhost:5173", "http://localhost:3000"],
         validation_alias="CORS_ORIGINS",
         description="Allowed CORS origins",
@@ -33,19 +42,33 @@ class Settings(BaseSettings):
             return value
         if isinstance(value, str):
             stripped = value.strip()
-            if stripped.startswith("[") and stripped.endswith("]"):
-                # JSON-style list
+            if stripped.startswith("["):
                 try:
-                    import json
-
-                    parsed = json.loads(stripped)
+                    parsed = orjson.loads(stripped)
+                except orjson.JSONDecodeError:
+                    pass
+                else:
                     if isinstance(parsed, list):
                         return [str(item) for item in parsed]
-                except json.JSONDecodeError:
-                    pass
-            return [origin.strip() for origin in stripped.split(",") if origin.strip()]
+            return [origin for origin in _ORIGIN_SEPARATOR.split(stripped) if origin]
         return ["http://localhost:5173", "http://localhost:3000"]
 
+    @cached_property
+    def api_key_bytes(self) -> bytes:
+        """UTF-8 encoded ``api_key``, matching the raw bytes a client sends on the wire."""
+
+        return self.api_key.encode("utf-8")
+
+    @cached_property
+    def api_key_digest(self) -> bytes:
+        """Fixed-size digest of ``api_key`` used for constant-time comparisons."""
+
+        return digest_api_key(self.api_key_bytes)
+
+
+def digest_api_key(value: bytes) -> bytes:
+    return hashlib.blake2b(value, digest_size=32).digest()
+
 
 @lru_cache(maxsize=1)
 def _load_settings() -> Settings:
@@ -4,8 +4,10 @@ import secrets
 from functools import lru_cache
 
 from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketException, status
+from starlette.requests import HTTPConnection
 
-from app.config import Settings, get_settings
+from app.config import Settings, digest_api_key, get_settings
+from app.ollama_client import OllamaClient
 from app.rate_limiter import RateLimiter
 
 
@@ -24,9 +26,13 @@ def get_rate_limiter() -> RateLimiter:
     return RateLimiter(settings.rate_limit_rps, settings.rate_limit_burst)
 
 
+def get_ollama_client(connection: HTTPConnection) -> OllamaClient:
+    return connection.app.state.ollama
+
+
 async def enforce_rate_limit(request: Request, limiter: RateLimiter = Depends(get_rate_limiter)) -> None:
     client_id = _client_identifier_from_headers(request.headers, request.client.host if request.client else None)
-    allowed = await limiter.allow(client_id)
+    allowed = limiter.allow(client_id)
     if not allowed:
         raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
 
@@ -34,7 +40,7 @@ async def enforce_rate_limit(request: Request, limiter: RateLimiter = Depends(ge
 async def enforce_rate_limit_ws(websocket: WebSocket, limiter: RateLimiter = Depends(get_rate_limiter)) -> None:
     client = websocket.client.host if websocket.client else None  # type: ignore[optional-member]
     client_id = _client_identifier_from_headers(websocket.headers, client)
-    allowed = await limiter.allow(client_id)
+    allowed = limiter.allow(client_id)
     if not allowed:
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Rate limit exceeded")
 
@@ -43,27 +49,31 @@ def _should_enforce(settings: Settings) -> bool:
     return not settings.api_key_optional
 
 
-def _assert_key_configured(settings: Settings) -> str:
+def _assert_key_configured(settings: Settings) -> bytes:
     if not settings.api_key:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="API key not configured")
-    return settings.api_key
+    return settings.api_key_digest
+
+
+def _key_matches(provided: str, expected_digest: bytes) -> bool:
+    # Both sides are hashed to 32 bytes and always compared so timing does not depend on
+    # whether a key was sent or on its length. Header values are latin-1 decoded by Starlette,
+    # so re-encoding as latin-1 recovers the original wire bytes.
+    return secrets.compare_digest(digest_api_key(provided.encode("latin-1")), expected_digest)
 
 
 async def verify_api_key(request: Request, settings: Settings = Depends(get_settings)) -> None:
     if not _should_enforce(settings):
         return
     expected = _assert_key_configured(settings)
-    provided = request.headers.get("x-api-key")
-    if not provided or not secrets.compare_digest(provided, expected):
+    if not _key_matches(request.headers.get("x-api-key", ""), expected):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
 
 
 async def verify_api_key_ws(websocket: WebSocket, settings: Settings = Depends(get_settings)) -> None:
     if not _should_enforce(settings):
         return
-    expected = settings.api_key
-    if not expected:
+    if not settings.api_key:
         raise WebSocketException(code=status.WS_1011_INTERNAL_ERROR, reason="API key not configured")
-    provided = websocket.headers.get("x-api-key")
-    if not provided or not secrets.compare_digest(provided, expected):
+    if not _key_matches(websocket.headers.get("x-api-key", ""), settings.api_key_digest):
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid API key")
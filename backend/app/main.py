@@ -1,33 +1,74 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import logging.config
 import time
 import uuid
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Mapping, Optional, Tuple
 
 import orjson
 from fastapi import Depends, FastAPI, HTTPException, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.websockets import WebSocketState
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.config import Settings, get_settings
-from app.deps import enforce_rate_limit, enforce_rate_limit_ws, verify_api_key, verify_api_key_ws
+from app.deps import enforce_rate_limit, enforce_rate_limit_ws, get_ollama_client, verify_api_key, verify_api_key_ws
 from app.metrics import metrics
 from app.ollama_client import OllamaClient, OllamaServiceError
-from app.schemas import ChatMessage, ChatRequest, ChatResponse, MetricsResponse, ModelInfo, ModelListResponse, UsageStats
+from app.schemas import ChatRequest, ChatResponse, MetricsResponse, ModelListResponse, UsageStats
+
+
+_RESERVED_LOG_ATTRS = frozenset(
+    {
+        "name",
+        "msg",
+        "args",
+        "levelname",
+        "levelno",
+        "pathname",
+        "filename",
+        "module",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+        "lineno",
+        "funcName",
+        "created",
+        "msecs",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "processName",
+        "process",
+    }
+)
 
 
 class JsonFormatter(logging.Formatter):
     """Formats log records as JSON strings."""
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Records arrive in bursts within the same second; reuse the formatted date/time prefix.
+        self._second_cache: tuple[int, str] = (-1, "")
+
+    def _timestamp(self, record: logging.LogRecord) -> str:
+        second = int(record.created)
+        cached_second, prefix = self._second_cache
+        if cached_second != second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_cache = (second, prefix)
+        return f"{prefix}.{int(record.msecs):03d}Z"
+
     def format(self, record: logging.LogRecord) -> str:  # noqa: D401
-        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
-        timestamp = f"{timestamp}.{int(record.msecs):03d}Z"
         log = {
-            "timestamp": timestamp,
+            "timestamp": self._timestamp(record),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -35,33 +76,30 @@ class JsonFormatter(logging.Formatter):
         if record.exc_info:
             log["exc_info"] = self.formatException(record.exc_info)
         for key, value in record.__dict__.items():
-            if key in {
-                "name",
-                "msg",
-                "args",
-                "levelname",
-                "levelno",
-                "pathname",
-                "filename",
-                "module",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-                "lineno",
-                "funcName",
-                "created",
-                "msecs",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "processName",
-                "process",
-            }:
-                continue
-            log[key] = value
+            if key not in _RESERVED_LOG_ATTRS:
+                log[key] = value
         return orjson.dumps(log).decode("utf-8")
 
 
+class ScopedCORSMiddleware(CORSMiddleware):
+    """CORS middleware that skips exempt paths and checks origins with a set lookup.
+
+    WebSocket scopes are already passed straight through by ``CORSMiddleware``; exempt HTTP paths
+    such as health probes bypass header parsing entirely.
+    """
+
+    def __init__(self, app: Any, *, exempt_paths: frozenset[str] = frozenset(), **kwargs: Any) -> None:
+        super().__init__(app, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        if scope["type"] == "http" and scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 def configure_logging() -> None:
     logging_config = {
         "version": 1,
@@ -84,19 +122,40 @@ def configure_logging() -> None:
     logging.config.dictConfig(logging_config)
 
 
+# SSE token coalescing: a frame closes this long after its first token or once it holds this many.
+_SSE_COALESCE_WINDOW_S = 0.015
+_SSE_COALESCE_MAX_CHUNKS = 32
+_STREAM_END = object()
+_CHAT_REQUEST_ADAPTER = TypeAdapter(ChatRequest)
+# Rendered /api/models body, keyed on the identity of the client's cached model list.
+_models_body: Optional[Tuple[List[Dict[str, Any]], bytes]] = None
+
 configure_logging()
 settings: Settings = get_settings()
-ollama_client = OllamaClient(settings.ollama_base_url)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    # Created on the serving loop so httpx transports bind to the loop that uses them.
+    client = OllamaClient(settings.ollama_base_url, uds=settings.ollama_uds)
+    app.state.ollama = client
+    try:
+        yield
+    finally:
+        await client.close()
+
+
 app = FastAPI(
     title="Jetson Chat Gateway",
     version="0.1.0",
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
-    CORSMiddleware,
+    ScopedCORSMiddleware,
+    exempt_paths=frozenset({"/healthz"}),
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
@@ -104,11 +163,6 @@ app.add_middleware(
 )
 
 
-@app.on_event("shutdown")
-async def shutdown_event() -> None:
-    await ollama_client.close()
-
-
 @app.get("/healthz", tags=["system"])
 async def healthz() -> Dict[str, str]:
     return {"status": "ok"}
@@ -116,42 +170,53 @@ async def healthz() -> Dict[str, str]:
 
 @app.get(
     "/api/models",
-    response_model=ModelListResponse,
+    response_model=None,
+    responses={200: {"model": ModelListResponse}},
     dependencies=[Depends(verify_api_key), Depends(enforce_rate_limit)],
 )
-async def list_models() -> ModelListResponse:
+async def list_models(ollama_client: OllamaClient = Depends(get_ollama_client)) -> Response:
+    global _models_body
     try:
         raw_models = await ollama_client.list_models()
     except OllamaServiceError as exc:
         raise HTTPException(status_code=_map_status(exc.status_code), detail=str(exc)) from exc
 
+    cached = _models_body
+    if cached is not None and cached[0] is raw_models:
+        return Response(content=cached[1], media_type="application/json")
+
     models = []
     for raw in raw_models:
         name = raw.get("name") or raw.get("model")
         if not name:
             continue
         models.append(
-            ModelInfo(
-                name=name,
-                modified_at=raw.get("modified_at"),
-                size=raw.get("size"),
-                digest=raw.get("digest"),
-            )
+            {
+                "name": name,
+                "modified_at": raw.get("modified_at"),
+                "size": raw.get("size"),
+                "digest": raw.get("digest"),
+            }
         )
-    return ModelListResponse(models=models)
+    body = orjson.dumps({"models": models})
+    _models_body = (raw_models, body)
+    return Response(content=body, media_type="application/json")
 
 
 @app.post(
     "/api/chat",
-    response_model=ChatResponse,
+    response_model=None,
+    responses={200: {"model": ChatResponse}},
     dependencies=[Depends(verify_api_key), Depends(enforce_rate_limit)],
 )
-async def chat_endpoint(payload: ChatRequest) -> ChatResponse | StreamingResponse:
+async def chat_endpoint(
+    payload: ChatRequest, ollama_client: OllamaClient = Depends(get_ollama_client)
+) -> ORJSONResponse | StreamingResponse:
     model_name = payload.model or settings.default_model
-    messages = [message.model_dump() for message in payload.messages]
+    messages = payload.messages
     options = _build_options(payload)
     if payload.stream:
-        generator = _sse_chat_generator(model_name, messages, options)
+        generator = _sse_chat_generator(ollama_client, model_name, messages, options)
         headers = {
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
@@ -164,21 +229,23 @@ async def chat_endpoint(payload: ChatRequest) -> ChatResponse | StreamingRespons
     except OllamaServiceError as exc:
         raise HTTPException(status_code=_map_status(exc.status_code), detail=str(exc)) from exc
 
-    content = _extract_content(response)
-    usage = UsageStats(
-        prompt_tokens=int(response.get("prompt_eval_count") or 0),
-        completion_tokens=int(response.get("eval_count") or 0),
-    )
-    usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+    prompt_tokens = int(response.get("prompt_eval_count") or 0)
+    completion_tokens = int(response.get("eval_count") or 0)
     latency_ms = int((time.perf_counter() - started) * 1000)
-    metrics.record(latency_ms, usage.prompt_tokens, usage.completion_tokens)
-
-    return ChatResponse(
-        id=response.get("id") or str(uuid.uuid4()),
-        model=response.get("model") or model_name,
-        content=content,
-        usage=usage,
-        latency_ms=latency_ms,
+    metrics.record(latency_ms, prompt_tokens, completion_tokens)
+
+    return ORJSONResponse(
+        {
+            "id": response.get("id") or str(uuid.uuid4()),
+            "model": response.get("model") or model_name,
+            "content": _extract_content(response),
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            "latency_ms": latency_ms,
+        }
     )
 
 
@@ -197,13 +264,15 @@ async def websocket_chat(
     websocket: WebSocket,
     _: None = Depends(verify_api_key_ws),
     __: None = Depends(enforce_rate_limit_ws),
+    ollama_client: OllamaClient = Depends(get_ollama_client),
 ) -> None:
     await websocket.accept()
     while True:
         try:
-            data = await websocket.receive_json()
-        except WebSocketDisconnect:
-            break
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = orjson.loads(message.get("text") or message.get("bytes") or b"")
         except Exception as exc:
             await _send_ws_error(websocket, f"Invalid message: {exc}")
             continue
@@ -218,28 +287,40 @@ async def websocket_chat(
             "stream": True,
         }
         try:
-            chat_request = ChatRequest(**merged_payload)
+            chat_request = _CHAT_REQUEST_ADAPTER.validate_python(merged_payload)
         except ValidationError as exc:
             await _send_ws_error(websocket, "Invalid payload", details=exc.errors())
             continue
 
-        await _handle_websocket_chat(websocket, chat_request)
+        await _handle_websocket_chat(websocket, ollama_client, chat_request)
 
 
 async def _sse_chat_generator(
-    model_name: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]]
-) -> AsyncGenerator[str, None]:
+    ollama_client: OllamaClient,
+    model_name: str,
+    messages: List[Dict[str, str]],
+    options: Optional[Mapping[str, Any]],
+) -> AsyncGenerator[bytes, None]:
     started = time.perf_counter()
-    collected: List[str] = []
+    collected = bytearray()
     done_sent = False
     try:
-        async for chunk in ollama_client.stream_chat(model=model_name, messages=messages, options=options):
-            if chunk.get("error"):
-                raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(chunk["error"]))
-            token = _token_from_chunk(chunk)
-            if token:
-                collected.append(token)
-                yield _format_sse({"type": "token", "token": token})
+        chunks = ollama_client.stream_chat(model=model_name, messages=messages, options=options)
+        async for batch in _coalesce_chunks(chunks):
+            tokens: List[str] = []
+            for chunk in batch:
+                if chunk.get("error"):
+                    if tokens:
+                        yield _format_tokens_sse(tokens)
+                    raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(chunk["error"]))
+                token = _token_from_chunk(chunk)
+                if token:
+                    tokens.append(token)
+            if tokens:
+                for token in tokens:
+                    collected += token.encode("utf-8")
+                yield _format_tokens_sse(tokens)
+            chunk = batch[-1]
             if chunk.get("done"):
                 done_sent = True
                 usage = _usage_from_chunk(chunk)
@@ -248,7 +329,7 @@ async def _sse_chat_generator(
                 metrics.record(latency_ms, usage.prompt_tokens, usage.completion_tokens)
                 done_event = {
                     "type": "done",
-                    "content": "".join(collected),
+                    "content": collected.decode("utf-8"),
                     "usage": usage.model_dump(),
                     "latency_ms": latency_ms,
                 }
@@ -263,21 +344,79 @@ async def _sse_chat_generator(
         yield _format_sse(
             {
                 "type": "done",
-                "content": "".join(collected),
+                "content": collected.decode("utf-8"),
                 "usage": usage.model_dump(),
                 "latency_ms": latency_ms,
             }
         )
 
 
-async def _handle_websocket_chat(websocket: WebSocket, chat_request: ChatRequest) -> None:
+async def _coalesce_chunks(source: AsyncIterator[Dict[str, Any]]) -> AsyncGenerator[List[Dict[str, Any]], None]:
+    """Group upstream chunks arriving within a short window so they share one SSE frame.
+
+    The upstream generator is drained by a single producer task so its httpx stream is never
+    resumed from a cancelled ``wait_for``. ``done`` and ``error`` chunks always close a group.
+    """
+
+    queue: asyncio.Queue[Any] = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for chunk in source:
+                queue.put_nowait(chunk)
+        except Exception as exc:
+            queue.put_nowait(exc)
+            return
+        queue.put_nowait(_STREAM_END)
+
+    loop = asyncio.get_running_loop()
+    producer = asyncio.create_task(pump())
+    try:
+        item = await queue.get()
+        while True:
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            batch = [item]
+            item = None
+            deadline = loop.time() + _SSE_COALESCE_WINDOW_S
+            while len(batch) < _SSE_COALESCE_MAX_CHUNKS and not _closes_batch(batch[-1]):
+                if queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is _STREAM_END or isinstance(item, Exception):
+                    break
+                batch.append(item)
+                item = None
+            yield batch
+            if item is None:
+                item = await queue.get()
+    finally:
+        producer.cancel()
+
+
+def _closes_batch(chunk: Dict[str, Any]) -> bool:
+    return bool(chunk.get("done") or chunk.get("error"))
+
+
+async def _handle_websocket_chat(
+    websocket: WebSocket, ollama_client: OllamaClient, chat_request: ChatRequest
+) -> None:
     started = time.perf_counter()
-    collected: List[str] = []
+    collected = bytearray()
     done_sent = False
     try:
         async for chunk in ollama_client.stream_chat(
             model=chat_request.model or settings.default_model,
-            messages=[message.model_dump() for message in chat_request.messages],
+            messages=chat_request.messages,
             options=_build_options(chat_request),
         ):
             if chunk.get("error"):
@@ -285,7 +424,7 @@ async def _handle_websocket_chat(websocket: WebSocket, chat_request: ChatRequest
                 return
             token = _token_from_chunk(chunk)
             if token:
-                collected.append(token)
+                collected += token.encode("utf-8")
                 await websocket.send_json({"type": "token", "token": token})
             if chunk.get("done"):
                 usage = _usage_from_chunk(chunk)
@@ -295,7 +434,7 @@ async def _handle_websocket_chat(websocket: WebSocket, chat_request: ChatRequest
                 await websocket.send_json(
                     {
                         "type": "done",
-                        "content": "".join(collected),
+                        "content": collected.decode("utf-8"),
                         "usage": usage.model_dump(),
                         "latency_ms": latency_ms,
                     }
@@ -308,7 +447,7 @@ async def _handle_websocket_chat(websocket: WebSocket, chat_request: ChatRequest
             await websocket.send_json(
                 {
                     "type": "done",
-                    "content": "".join(collected),
+                    "content": collected.decode("utf-8"),
                     "usage": UsageStats().model_dump(),
                     "latency_ms": latency_ms,
                 }
@@ -322,16 +461,21 @@ async def _handle_websocket_chat(websocket: WebSocket, chat_request: ChatRequest
         await _send_ws_error(websocket, f"Unexpected error: {exc}")
 
 
-def _build_options(payload: ChatRequest) -> Dict[str, Any]:
-    return {
-        key: value
-        for key, value in {
-            "temperature": payload.temperature,
-            "top_p": payload.top_p,
-            "seed": payload.seed,
-        }.items()
-        if value is not None
-    }
+def _build_options(payload: ChatRequest) -> Mapping[str, Any]:
+    return _options_for(payload.temperature, payload.top_p, payload.seed)
+
+
+@lru_cache(maxsize=64)
+def _options_for(temperature: Optional[float], top_p: Optional[float], seed: Optional[int]) -> Mapping[str, Any]:
+    # Clients tend to resend the same sampling parameters, so the read-only result is shared.
+    options: Dict[str, Any] = {}
+    if temperature is not None:
+        options["temperature"] = temperature
+    if top_p is not None:
+        options["top_p"] = top_p
+    if seed is not None:
+        options["seed"] = seed
+    return MappingProxyType(options)
 
 
 def _token_from_chunk(chunk: Dict[str, Any]) -> str:
@@ -352,8 +496,15 @@ def _usage_from_chunk(chunk: Dict[str, Any]) -> UsageStats:
     )
 
 
-def _format_sse(payload: Dict[str, Any]) -> str:
-    return f"data: {orjson.dumps(payload).decode('utf-8')}\n\n"
+def _format_sse(payload: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE) + b"\n"
+
+
+def _format_tokens_sse(tokens: List[str]) -> bytes:
+    # Single tokens keep the original event shape so idle streams stay compatible with older clients.
+    if len(tokens) == 1:
+        return _format_sse({"type": "token", "token": tokens[0]})
+    return _format_sse({"type": "tokens", "tokens": tokens})
 
 
 def _map_status(status_code: int) -> int:
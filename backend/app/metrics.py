@@ -2,42 +2,125 @@ from __future__ import annotations
 
 import math
 import threading
-from collections import deque
-from typing import Deque, Dict
+from typing import Dict, List
+
+
+_FOLD_THRESHOLD = 256
 
 
 class MetricsCollector:
-    """Tracks basic request/latency/token metrics for observability."""
+    """Tracks basic request/latency/token metrics for observability.
+
+    ``record`` is called from the event loop thread, so the counters are plain ints and latencies
+    are buffered without taking the lock. The lock only guards folding that buffer into the
+    percentile sketches, which happens on ``snapshot`` or once the buffer fills up.
+    """
 
-    def __init__(self, window_size: int = 512) -> None:
+    def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._latencies: Deque[float] = deque(maxlen=window_size)
+        self._pending: List[float] = []
+        self._p50 = P2Quantile(0.5)
+        self._p95 = P2Quantile(0.95)
         self._requests_total = 0
         self._prompt_tokens = 0
         self._completion_tokens = 0
 
     def record(self, latency_ms: float, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
-        with self._lock:
-            self._requests_total += 1
-            self._prompt_tokens += max(0, prompt_tokens)
-            self._completion_tokens += max(0, completion_tokens)
-            self._latencies.append(max(0.0, float(latency_ms)))
+        self._requests_total += 1
+        if prompt_tokens > 0:
+            self._prompt_tokens += prompt_tokens
+        if completion_tokens > 0:
+            self._completion_tokens += completion_tokens
+        pending = self._pending
+        pending.append(max(0.0, float(latency_ms)))
+        if len(pending) >= _FOLD_THRESHOLD:
+            self._fold()
 
     def snapshot(self) -> Dict[str, float | int]:
+        self._fold()
         with self._lock:
-            latencies = list(self._latencies)
-            requests = self._requests_total
-            prompt = self._prompt_tokens
-            completion = self._completion_tokens
-
+            p50 = self._p50.value()
+            p95 = self._p95.value()
         return {
-            "requests_total": requests,
-            "tokens_prompt_total": prompt,
-            "tokens_completion_total": completion,
-            "latency_ms_p50": _percentile(latencies, 0.5),
-            "latency_ms_p95": _percentile(latencies, 0.95),
+            "requests_total": self._requests_total,
+            "tokens_prompt_total": self._prompt_tokens,
+            "tokens_completion_total": self._completion_tokens,
+            "latency_ms_p50": p50,
+            "latency_ms_p95": p95,
         }
 
+    def _fold(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for latency in pending:
+                self._p50.add(latency)
+                self._p95.add(latency)
+
+
+class P2Quantile:
+    """Streaming quantile estimate using the P² algorithm (Jain & Chlamtac, 1985).
+
+    Keeps five markers instead of the observations, so ``add`` and ``value`` are O(1).
+    """
+
+    def __init__(self, quantile: float) -> None:
+        self.quantile = quantile
+        self._heights: List[float] = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 2 * quantile, 4 * quantile, 2 + 2 * quantile, 4.0]
+        self._increments = [0.0, quantile / 2, quantile, (1 + quantile) / 2, 1.0]
+
+    def add(self, value: float) -> None:
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+
+        positions = self._positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            delta = desired[i] - positions[i]
+            if (delta >= 1 and positions[i + 1] - positions[i] > 1) or (
+                delta <= -1 and positions[i - 1] - positions[i] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                candidate = self._parabolic(i, step)
+                if heights[i - 1] < candidate < heights[i + 1]:
+                    heights[i] = candidate
+                else:
+                    heights[i] += step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                positions[i] += step
+
+    def value(self) -> float:
+        if len(self._heights) < 5 or self._positions[4] < 5:
+            return _percentile(self._heights, self.quantile)
+        return self._heights[2]
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q = self._heights
+        n = self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
 
 def _percentile(values: list[float], percentile: float) -> float:
     if not values:
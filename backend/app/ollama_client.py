@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Any, AsyncGenerator, Dict, List, Optional
+import time
+from typing import Any, AsyncGenerator, Dict, List, Mapping, Optional, Tuple
 
 import httpx
+import orjson
+
+# Installed models rarely change; serve /api/tags from memory for this long.
+_MODELS_CACHE_TTL_S = 10.0
 
 
 class OllamaServiceError(Exception):
@@ -15,18 +21,43 @@ class OllamaServiceError(Exception):
 class OllamaClient:
     """Thin async wrapper around the Ollama HTTP API."""
 
-    def __init__(self, base_url: str) -> None:
+    def __init__(self, base_url: str, uds: Optional[str] = None) -> None:
         timeout = httpx.Timeout(timeout=120.0, connect=5.0, read=120.0, write=60.0)
+        # Ollama is local, so keep a small pool of long-lived keep-alive connections; a Unix
+        # socket skips the TCP loopback entirely when the daemon listens on one.
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=300.0)
+        transport = httpx.AsyncHTTPTransport(limits=limits, retries=0, uds=uds or None)
         self._client = httpx.AsyncClient(
             base_url=base_url.rstrip("/"),
             timeout=timeout,
             headers={"Accept": "application/json"},
+            transport=transport,
         )
+        self._models_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._models_lock = asyncio.Lock()
 
     async def close(self) -> None:
         await self._client.aclose()
 
     async def list_models(self) -> List[Dict[str, Any]]:
+        """Return installed models, cached for a few seconds.
+
+        The same list object is returned while the cache is fresh, so callers can key derived
+        data on its identity. Concurrent misses share a single upstream request.
+        """
+
+        cached = self._models_cache
+        if cached is not None and time.monotonic() - cached[0] < _MODELS_CACHE_TTL_S:
+            return cached[1]
+        async with self._models_lock:
+            cached = self._models_cache
+            if cached is not None and time.monotonic() - cached[0] < _MODELS_CACHE_TTL_S:
+                return cached[1]
+            models = await self._fetch_models()
+            self._models_cache = (time.monotonic(), models)
+            return models
+
+    async def _fetch_models(self) -> List[Dict[str, Any]]:
         try:
             response = await self._client.get("/api/tags")
             response.raise_for_status()
@@ -45,7 +76,7 @@ class OllamaClient:
         *,
         model: str,
         messages: List[Dict[str, str]],
-        options: Optional[Dict[str, Any]] = None,
+        options: Optional[Mapping[str, Any]] = None,
     ) -> Dict[str, Any]:
         payload = self._build_payload(model=model, messages=messages, stream=False, options=options)
         try:
@@ -62,19 +93,24 @@ class OllamaClient:
         *,
         model: str,
         messages: List[Dict[str, str]],
-        options: Optional[Dict[str, Any]] = None,
+        options: Optional[Mapping[str, Any]] = None,
     ) -> AsyncGenerator[Dict[str, Any], None]:
         payload = self._build_payload(model=model, messages=messages, stream=True, options=options)
         try:
             async with self._client.stream("POST", "/api/chat", json=payload) as response:
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
-                    try:
-                        yield json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
+                # Ollama streams NDJSON; split on raw bytes so lines never round-trip through str.
+                pending = b""
+                async for data in response.aiter_bytes():
+                    lines = (pending + data).split(b"\n")
+                    pending = lines.pop()
+                    for line in lines:
+                        chunk = _parse_line(line)
+                        if chunk is not None:
+                            yield chunk
+                chunk = _parse_line(pending)
+                if chunk is not None:
+                    yield chunk
         except httpx.HTTPStatusError as exc:
             raise OllamaServiceError(_response_message(exc.response), status_code=exc.response.status_code) from exc
         except httpx.RequestError as exc:
@@ -86,7 +122,7 @@ class OllamaClient:
         model: str,
         messages: List[Dict[str, str]],
         stream: bool,
-        options: Optional[Dict[str, Any]] = None,
+        options: Optional[Mapping[str, Any]] = None,
     ) -> Dict[str, Any]:
         payload = {
             "model": model,
@@ -99,6 +135,15 @@ class OllamaClient:
         return payload
 
 
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    if not line.strip():
+        return None
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+
+
 def _response_message(response: httpx.Response) -> str:
     try:
         payload = response.json()
@@ -1,10 +1,19 @@
-import asyncio
 import time
-from typing import Dict
+from array import array
+from typing import Dict, List
+
+_SWEEP_INTERVAL = 60.0
 
 
 class RateLimiter:
-    """Simple in-memory token bucket rate limiter keyed by client identifier."""
+    """Simple in-memory token bucket rate limiter keyed by client identifier.
+
+    ``allow`` never awaits, so on a single event loop each check runs to completion without
+    interleaving and needs no lock. Bucket state is kept as parallel arrays of C doubles indexed
+    through ``_idx`` to avoid a per-client container object. A bucket idle for ``capacity / rate``
+    seconds has fully refilled and is indistinguishable from a new one, so it is dropped on the
+    next sweep.
+    """
 
     def __init__(self, rate: float, burst: int) -> None:
         if rate <= 0:
@@ -13,25 +22,56 @@ class RateLimiter:
             raise ValueError("burst must be > 0")
         self.rate = float(rate)
         self.capacity = float(burst)
-        self._buckets: Dict[str, dict[str, float]] = {}
-        self._lock = asyncio.Lock()
+        self._refill_seconds = self.capacity / self.rate
+        self._idx: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._tokens = array("d")
+        self._ts = array("d")
+        self._last_sweep = time.monotonic()
 
-    async def allow(self, client_id: str) -> bool:
+    def allow(self, client_id: str) -> bool:
         now = time.monotonic()
-        async with self._lock:
-            bucket = self._buckets.get(client_id)
-            if bucket is None:
-                bucket = {"tokens": self.capacity, "timestamp": now}
-                self._buckets[client_id] = bucket
-
-            elapsed = max(0.0, now - bucket["timestamp"])
-            refilled = min(self.capacity, bucket["tokens"] + elapsed * self.rate)
-
-            if refilled < 1.0:
-                bucket["tokens"] = refilled
-                bucket["timestamp"] = now
-                return False
-
-            bucket["tokens"] = refilled - 1.0
-            bucket["timestamp"] = now
+        if now - self._last_sweep > _SWEEP_INTERVAL:
+            self._evict_idle(now)
+
+        i = self._idx.get(client_id)
+        if i is None:
+            self._idx[client_id] = len(self._ids)
+            self._ids.append(client_id)
+            self._tokens.append(self.capacity - 1.0)
+            self._ts.append(now)
+            return True
+
+        elapsed = now - self._ts[i]
+        self._ts[i] = now
+        if elapsed >= self._refill_seconds:
+            # Idle long enough to be back at capacity; skip the refill arithmetic.
+            self._tokens[i] = self.capacity - 1.0
             return True
+
+        refilled = min(self.capacity, self._tokens[i] + max(0.0, elapsed) * self.rate)
+        if refilled < 1.0:
+            self._tokens[i] = refilled
+            return False
+
+        self._tokens[i] = refilled - 1.0
+        return True
+
+    def _evict_idle(self, now: float) -> None:
+        self._last_sweep = now
+        cutoff = now - self._refill_seconds
+        ts = self._ts
+        stale = [client_id for client_id, i in self._idx.items() if ts[i] < cutoff]
+        for client_id in stale:
+            # Swap the last slot into the freed one so the arrays stay dense.
+            i = self._idx.pop(client_id)
+            last = len(self._ids) - 1
+            if i != last:
+                moved = self._ids[last]
+                self._ids[i] = moved
+                self._tokens[i] = self._tokens[last]
+                ts[i] = ts[last]
+                self._idx[moved] = i
+            self._ids.pop()
+            self._tokens.pop()
+            ts.pop()
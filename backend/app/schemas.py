@@ -4,9 +4,12 @@ from datetime import datetime
 from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
+from typing_extensions import TypedDict
 
 
-class ChatMessage(BaseModel):
+class ChatMessage(TypedDict):
+    """Validated into a plain dict so messages can be forwarded to Ollama without ``model_dump``."""
+
     role: Literal["system", "user", "assistant"]
     content: str
 
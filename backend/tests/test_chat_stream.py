@@ -0,0 +1,57 @@
+import asyncio
+
+import orjson
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+class FakeOllamaClient:
+    def __init__(self, chunks, delay: float = 0.0) -> None:
+        self._chunks = chunks
+        self._delay = delay
+
+    async def stream_chat(self, *, model, messages, options=None):
+        for chunk in self._chunks:
+            if self._delay:
+                await asyncio.sleep(self._delay)
+            yield chunk
+
+
+def _events(body: bytes) -> list[dict]:
+    return [orjson.loads(frame[len(b"data: ") :]) for frame in body.split(b"\n\n") if frame]
+
+
+async def _stream(monkeypatch, chunks, delay: float = 0.0) -> list[dict]:
+    monkeypatch.setattr(app.state, "ollama", FakeOllamaClient(chunks, delay), raising=False)
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        response = await client.post(
+            "/api/chat", json={"messages": [{"role": "user", "content": "hi"}], "stream": True}
+        )
+        assert response.status_code == 200
+        return _events(response.content)
+
+
+@pytest.mark.anyio
+async def test_sse_coalesces_burst_tokens(monkeypatch) -> None:
+    chunks = [{"message": {"content": c}} for c in "abc"]
+    chunks.append({"done": True, "prompt_eval_count": 2, "eval_count": 3})
+    events = await _stream(monkeypatch, chunks)
+    assert events[0] == {"type": "tokens", "tokens": ["a", "b", "c"]}
+    assert events[-1]["type"] == "done"
+    assert events[-1]["content"] == "abc"
+    assert events[-1]["usage"] == {"prompt_tokens": 2, "completion_tokens": 3, "total_tokens": 5}
+
+
+@pytest.mark.anyio
+async def test_sse_flushes_single_tokens_when_idle(monkeypatch) -> None:
+    chunks = [{"message": {"content": "a"}}, {"message": {"content": "b"}}, {"done": True}]
+    events = await _stream(monkeypatch, chunks, delay=0.05)
+    assert events[:2] == [{"type": "token", "token": "a"}, {"type": "token", "token": "b"}]
+    assert events[-1]["content"] == "ab"
@@ -0,0 +1,26 @@
+import random
+
+from app.metrics import MetricsCollector, P2Quantile
+
+
+def test_p2_quantile_tracks_uniform_distribution() -> None:
+    rng = random.Random(7)
+    p50 = P2Quantile(0.5)
+    p95 = P2Quantile(0.95)
+    for _ in range(5000):
+        value = rng.uniform(0, 1000)
+        p50.add(value)
+        p95.add(value)
+    assert abs(p50.value() - 500) < 25
+    assert abs(p95.value() - 950) < 25
+
+
+def test_snapshot_uses_exact_percentiles_for_small_samples() -> None:
+    collector = MetricsCollector()
+    assert collector.snapshot()["latency_ms_p50"] == 0.0
+    for latency in (10, 30, 20):
+        collector.record(latency, prompt_tokens=1, completion_tokens=2)
+    snapshot = collector.snapshot()
+    assert snapshot["requests_total"] == 3
+    assert snapshot["tokens_completion_total"] == 6
+    assert snapshot["latency_ms_p50"] == 20
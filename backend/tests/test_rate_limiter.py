@@ -0,0 +1,23 @@
+from app.rate_limiter import RateLimiter
+
+
+def test_rate_limiter_enforces_burst_per_client() -> None:
+    limiter = RateLimiter(rate=0.001, burst=2)
+    assert limiter.allow("a")
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+    assert limiter.allow("b")
+
+
+def test_rate_limiter_evicts_idle_clients(monkeypatch) -> None:
+    clock = [100.0]
+    monkeypatch.setattr("app.rate_limiter.time.monotonic", lambda: clock[0])
+    limiter = RateLimiter(rate=1.0, burst=1)
+    for client_id in ("a", "b", "c"):
+        assert limiter.allow(client_id)
+    clock[0] += 59.5
+    assert limiter.allow("b")
+    clock[0] += 1.0
+    assert limiter.allow("d")
+    assert sorted(limiter._idx) == ["b", "d"]
+    assert not limiter.allow("d")
@@ -11,6 +11,7 @@ import type {
   StreamDoneEvent,
   StreamEvent,
   StreamTokenEvent,
+  StreamTokensEvent,
   TransportKind,
   Usage
 } from "@/lib/types";
@@ -192,6 +193,9 @@ export const useChat = (config: ChatConfig) => {
       if (!activeRef.current) return;
       if (event.type === "token") {
         dispatch({ type: "TOKEN", assistantId: activeRef.current.assistantId, token: (event as StreamTokenEvent).token });
+      } else if (event.type === "tokens") {
+        const token = (event as StreamTokensEvent).tokens.join("");
+        dispatch({ type: "TOKEN", assistantId: activeRef.current.assistantId, token });
       } else if (event.type === "done") {
         const done = event as StreamDoneEvent;
         dispatch({
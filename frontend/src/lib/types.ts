@@ -34,10 +34,11 @@ export interface ChatPayload {
 }
 
 export type StreamTokenEvent = { type: "token"; token: string };
+export type StreamTokensEvent = { type: "tokens"; tokens: string[] };
 export type StreamDoneEvent = { type: "done"; content: string; usage: Usage; latency_ms: number };
 export type StreamErrorEvent = { type: "error"; message: string; details?: unknown };
 
-export type StreamEvent = StreamTokenEvent | StreamDoneEvent | StreamErrorEvent;
+export type StreamEvent = StreamTokenEvent | StreamTokensEvent | StreamDoneEvent | StreamErrorEvent;
 
 export interface ModelInfo {
   name: string;